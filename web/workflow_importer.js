@@ -10,6 +10,227 @@ import { app } from "../../scripts/app.js";
 // Known metadata keys used by different ComfyUI versions
 const WORKFLOW_KEYS = ["workflow", "Workflow", "comfyui_workflow", "ComfyUI_Workflow"];
 const PROMPT_KEYS = ["prompt", "Prompt", "comfyui_prompt", "ComfyUI_Prompt"];
+const A1111_KEYS = ["parameters", "Parameters"];
+const WORKFLOW_KEY_SET = new Set(WORKFLOW_KEYS);
+const PROMPT_KEY_SET = new Set(PROMPT_KEYS);
+// Every key the importer reads - compressed chunks under other keys are never inflated
+const IMPORT_KEY_SET = new Set([...WORKFLOW_KEYS, ...PROMPT_KEYS, ...A1111_KEYS]);
+
+// PNG file signature and shared text decoders (reused across chunks/files)
+const PNG_SIGNATURE = [137, 80, 78, 71, 13, 10, 26, 10];
+const TEXT_DECODERS = {
+    "latin1": new TextDecoder("latin1"),
+    "utf-8": new TextDecoder("utf-8")
+};
+
+/**
+ * Extract workflow directly from image file data (client-side PNG metadata parsing)
+ */
+async function extractWorkflowFromData(file) {
+    try {
+        const metadata = await extractPngMetadata(file);
+        
+        // Sort metadata keys into workflow/prompt candidates in a single pass
+        let keyCount = 0;
+        const workflowKeys = [];
+        const promptKeys = [];
+        for (const key in metadata) {
+            keyCount++;
+            if (WORKFLOW_KEY_SET.has(key)) {
+                workflowKeys.push(key);
+            } else if (PROMPT_KEY_SET.has(key)) {
+                promptKeys.push(key);
+            }
+        }
+        
+        if (keyCount === 0) {
+            return { success: false, error: "No metadata found in image" };
+        }
+        
+        const workflow = parseFirstJson(metadata, workflowKeys, WORKFLOW_KEYS);
+        const prompt = parseFirstJson(metadata, promptKeys, PROMPT_KEYS);
+        
+        if (!workflow && !prompt) {
+            // Check for A1111 parameters
+            if (A1111_KEYS.some((key) => metadata[key])) {
+                return { 
+                    success: false, 
+                    error: "Image contains Automatic1111 parameters, not ComfyUI workflow" 
+                };
+            }
+            return { success: false, error: "No ComfyUI workflow found in image" };
+        }
+        
+        return {
+            success: true,
+            workflow: workflow,
+            prompt: prompt
+        };
+    } catch (err) {
+        return { success: false, error: `Extraction failed: ${err.message}` };
+    }
+}
+
+/**
+ * Parse the first candidate key holding valid JSON, trying candidates
+ * in the priority order given by knownKeys
+ */
+function parseFirstJson(metadata, candidates, knownKeys) {
+    if (candidates.length > 1) {
+        candidates.sort((a, b) => knownKeys.indexOf(a) - knownKeys.indexOf(b));
+    }
+    for (const key of candidates) {
+        if (metadata[key]) {
+            try {
+                return JSON.parse(metadata[key]);
+            } catch (e) {
+                continue;
+            }
+        }
+    }
+    return null;
+}
+
+/**
+ * Read a byte range of a File/Blob without loading the rest of it
+ */
+async function readBytes(file, start, end) {
+    return new Uint8Array(await file.slice(start, end).arrayBuffer());
+}
+
+/**
+ * Parse PNG file and extract tEXt/zTXt/iTXt chunks containing metadata.
+ * Only chunk headers and text chunk payloads are read from the file, and
+ * parsing stops at the first IDAT chunk: ComfyUI always writes its metadata
+ * before the pixel data, so there is no need to walk the rest of the file.
+ */
+async function extractPngMetadata(file) {
+    const metadata = {};
+    
+    // Verify PNG signature
+    const signature = await readBytes(file, 0, 8);
+    for (let i = 0; i < 8; i++) {
+        if (signature[i] !== PNG_SIGNATURE[i]) {
+            return metadata; // Not a valid PNG
+        }
+    }
+    
+    let offset = 8; // Skip PNG signature
+    
+    while (offset + 8 <= file.size) {
+        // Read chunk length (4 bytes, big-endian) and type (4 bytes)
+        const header = await readBytes(file, offset, offset + 8);
+        const length = new DataView(header.buffer).getUint32(0);
+        const type = String.fromCharCode(header[4], header[5], header[6], header[7]);
+        offset += 8;
+        
+        if (type === "IDAT" || type === "IEND") {
+            break; // Pixel data (or end of PNG) - no metadata past this point
+        }
+        
+        const chunkStart = offset;
+        offset += length + 4; // Skip chunk data and CRC
+        
+        if (type !== "tEXt" && type !== "zTXt" && type !== "iTXt") {
+            continue; // Never read payloads we don't need
+        }
+        const chunkData = await readBytes(file, chunkStart, chunkStart + length);
+        
+        const entry = await parseTextChunk(type, chunkData);
+        if (entry) {
+            metadata[entry.keyword] = entry.text;
+        }
+    }
+    
+    return metadata;
+}
+
+/**
+ * Decode a single tEXt/zTXt/iTXt chunk into its keyword and text.
+ * Layouts (all fields \0-terminated except the last):
+ *   tEXt: keyword, text (latin1)
+ *   zTXt: keyword, compression_method (1 byte), zlib text (latin1)
+ *   iTXt: keyword, compression_flag, compression_method (1 byte each),
+ *         language_tag, translated_keyword, text (utf-8, zlib if flagged)
+ */
+async function parseTextChunk(type, chunkData) {
+    const keywordEnd = chunkData.indexOf(0);
+    if (keywordEnd === -1) return null;
+    let pos = keywordEnd + 1;
+    
+    let decoder = TEXT_DECODERS["latin1"];
+    let compressed = false;
+    if (type === "zTXt") {
+        compressed = true;
+        pos += 1; // Skip compression method
+    } else if (type === "iTXt") {
+        decoder = TEXT_DECODERS["utf-8"];
+        compressed = chunkData[pos] === 1;
+        pos += 2; // Skip compression flag and method
+        
+        // Skip language tag and translated keyword
+        for (let i = 0; i < 2; i++) {
+            const fieldEnd = chunkData.indexOf(0, pos);
+            if (fieldEnd === -1) return null;
+            pos = fieldEnd + 1;
+        }
+    }
+    
+    const keyword = decoder.decode(chunkData.subarray(0, keywordEnd));
+    if (compressed && !IMPORT_KEY_SET.has(keyword)) {
+        return null; // e.g. "Raw profile type exif" - not worth inflating
+    }
+    const body = chunkData.subarray(pos);
+    
+    let text;
+    if (compressed) {
+        // Compressed with zlib - use DecompressionStream
+        try {
+            text = await decompressZlib(body, decoder);
+        } catch (e) {
+            if (type === "zTXt") {
+                return null; // zTXt is always compressed - drop corrupt chunks
+            }
+            // iTXt compression flag may be wrong - try uncompressed
+            text = decoder.decode(body);
+        }
+    } else {
+        text = decoder.decode(body);
+    }
+    
+    return { keyword, text };
+}
+
+/**
+ * Decompress zlib-compressed data using DecompressionStream API
+ */
+async function decompressZlib(compressed, decoder = TEXT_DECODERS["utf-8"]) {
+    const ds = new DecompressionStream("deflate");
+    const writer = ds.writable.getWriter();
+    // Errors on corrupt data surface through reader.read() below; swallow the
+    // writer-side rejections so they don't become unhandled promise rejections
+    writer.write(compressed).catch(() => {});
+    writer.close().catch(() => {});
+    
+    const reader = ds.readable.getReader();
+    const chunks = [];
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        if (value) chunks.push(value);
+    }
+    
+    const totalLength = chunks.reduce((acc, c) => acc + c.length, 0);
+    const decompressed = new Uint8Array(totalLength);
+    let offset = 0;
+    for (const chunk of chunks) {
+        decompressed.set(chunk, offset);
+        offset += chunk.length;
+    }
+    
+    return decoder.decode(decompressed);
+}
 
 /**
  * Dialog for importing workflows from images
@@ -248,16 +469,16 @@ class WorkflowImportDialog {
 
     async processImageFile(file) {
         // Extract workflow directly from image data (no upload needed)
-        const extractResult = await this.extractWorkflowFromData(file);
+        const extractResult = await extractWorkflowFromData(file);
 
         if (!extractResult.success) {
             return { success: false, error: extractResult.error };
         }
 
-        // Load the workflow into a new tab
+        // Load the workflow into a new tab.
+        // Prefer workflow over prompt as it contains the full graph
         const loadResult = await this.loadWorkflow(
-            extractResult.workflow,
-            extractResult.prompt,
+            extractResult.workflow || extractResult.prompt,
             file.name
         );
 
@@ -265,205 +486,10 @@ class WorkflowImportDialog {
     }
 
     /**
-     * Extract workflow directly from image file data (client-side PNG metadata parsing)
-     */
-    async extractWorkflowFromData(file) {
-        try {
-            const arrayBuffer = await file.arrayBuffer();
-            const metadata = await this.extractPngMetadata(new Uint8Array(arrayBuffer));
-            
-            if (!metadata || Object.keys(metadata).length === 0) {
-                return { success: false, error: "No metadata found in image" };
-            }
-            
-            // Extract workflow
-            let workflow = null;
-            for (const key of WORKFLOW_KEYS) {
-                if (metadata[key]) {
-                    try {
-                        workflow = JSON.parse(metadata[key]);
-                        break;
-                    } catch (e) {
-                        continue;
-                    }
-                }
-            }
-            
-            // Extract prompt
-            let prompt = null;
-            for (const key of PROMPT_KEYS) {
-                if (metadata[key]) {
-                    try {
-                        prompt = JSON.parse(metadata[key]);
-                        break;
-                    } catch (e) {
-                        continue;
-                    }
-                }
-            }
-            
-            if (!workflow && !prompt) {
-                // Check for A1111 parameters
-                if (metadata["parameters"] || metadata["Parameters"]) {
-                    return { 
-                        success: false, 
-                        error: "Image contains Automatic1111 parameters, not ComfyUI workflow" 
-                    };
-                }
-                return { success: false, error: "No ComfyUI workflow found in image" };
-            }
-            
-            return {
-                success: true,
-                workflow: workflow,
-                prompt: prompt
-            };
-        } catch (err) {
-            return { success: false, error: `Extraction failed: ${err.message}` };
-        }
-    }
-
-    /**
-     * Parse PNG file and extract tEXt/iTXt chunks containing metadata
-     */
-    async extractPngMetadata(data) {
-        const metadata = {};
-        
-        // Verify PNG signature
-        const pngSignature = [137, 80, 78, 71, 13, 10, 26, 10];
-        for (let i = 0; i < 8; i++) {
-            if (data[i] !== pngSignature[i]) {
-                return metadata; // Not a valid PNG
-            }
-        }
-        
-        let offset = 8; // Skip PNG signature
-        
-        while (offset < data.length) {
-            // Read chunk length (4 bytes, big-endian)
-            const length = (data[offset] << 24) | (data[offset + 1] << 16) | 
-                          (data[offset + 2] << 8) | data[offset + 3];
-            offset += 4;
-            
-            // Read chunk type (4 bytes)
-            const type = String.fromCharCode(data[offset], data[offset + 1], 
-                                             data[offset + 2], data[offset + 3]);
-            offset += 4;
-            
-            if (type === "tEXt") {
-                // tEXt chunk: keyword\0value
-                const chunkData = data.slice(offset, offset + length);
-                const nullIndex = chunkData.indexOf(0);
-                if (nullIndex !== -1) {
-                    const keyword = new TextDecoder("latin1").decode(chunkData.slice(0, nullIndex));
-                    const value = new TextDecoder("latin1").decode(chunkData.slice(nullIndex + 1));
-                    metadata[keyword] = value;
-                }
-            } else if (type === "iTXt") {
-                // iTXt chunk: keyword\0compression_flag\0compression_method\0language_tag\0translated_keyword\0text
-                const chunkData = data.slice(offset, offset + length);
-                let pos = 0;
-                
-                // Find keyword
-                const keywordEnd = chunkData.indexOf(0, pos);
-                if (keywordEnd === -1) {
-                    offset += length + 4; // Skip to next chunk
-                    continue;
-                }
-                const keyword = new TextDecoder("utf-8").decode(chunkData.slice(pos, keywordEnd));
-                pos = keywordEnd + 1;
-                
-                // Compression flag and method
-                const compressionFlag = chunkData[pos];
-                pos += 2; // Skip compression flag and method
-                
-                // Skip language tag
-                const langEnd = chunkData.indexOf(0, pos);
-                if (langEnd === -1) {
-                    offset += length + 4;
-                    continue;
-                }
-                pos = langEnd + 1;
-                
-                // Skip translated keyword
-                const transEnd = chunkData.indexOf(0, pos);
-                if (transEnd === -1) {
-                    offset += length + 4;
-                    continue;
-                }
-                pos = transEnd + 1;
-                
-                // Get text content
-                let text;
-                if (compressionFlag === 1) {
-                    // Compressed with zlib - use DecompressionStream
-                    try {
-                        const compressed = chunkData.slice(pos);
-                        text = await this.decompressZlib(compressed);
-                    } catch (e) {
-                        // Fallback: try uncompressed
-                        text = new TextDecoder("utf-8").decode(chunkData.slice(pos));
-                    }
-                } else {
-                    text = new TextDecoder("utf-8").decode(chunkData.slice(pos));
-                }
-                
-                metadata[keyword] = text;
-            } else if (type === "IEND") {
-                break; // End of PNG
-            }
-            
-            offset += length + 4; // Skip chunk data and CRC
-        }
-        
-        return metadata;
-    }
-
-    /**
-     * Decompress zlib-compressed data using DecompressionStream API
+     * Load already-parsed graph data (workflow or API prompt) into a new tab
      */
-    async decompressZlib(compressed) {
-        const ds = new DecompressionStream("deflate");
-        const writer = ds.writable.getWriter();
-        writer.write(compressed);
-        writer.close();
-        
-        const reader = ds.readable.getReader();
-        const chunks = [];
-        
-        while (true) {
-            const { done, value } = await reader.read();
-            if (done) break;
-            if (value) chunks.push(value);
-        }
-        
-        const totalLength = chunks.reduce((acc, c) => acc + c.length, 0);
-        const decompressed = new Uint8Array(totalLength);
-        let offset = 0;
-        for (const chunk of chunks) {
-            decompressed.set(chunk, offset);
-            offset += chunk.length;
-        }
-        
-        return new TextDecoder("utf-8").decode(decompressed);
-    }
-
-    async loadWorkflow(workflowJson, promptJson, filename) {
+    async loadWorkflow(graphData, filename) {
         try {
-            let graphData = null;
-
-            // Prefer workflow over prompt as it contains the full graph
-            if (workflowJson) {
-                graphData = typeof workflowJson === "string" 
-                    ? JSON.parse(workflowJson) 
-                    : workflowJson;
-            } else if (promptJson) {
-                // Prompt format is API format, may need conversion
-                graphData = typeof promptJson === "string"
-                    ? JSON.parse(promptJson)
-                    : promptJson;
-            }
-
             if (!graphData) {
                 return { success: false, error: "No valid workflow data found" };
             }
@@ -542,24 +568,30 @@ app.registerExtension({
     name: "Comfy.WorkflowImporter",
     
     async setup() {
-        // Create the import dialog instance
-        const importDialog = new WorkflowImportDialog();
+        // Create the import dialog (styles + DOM) on first use only
+        let importDialog = null;
+        const toggleDialog = () => {
+            if (!importDialog) {
+                importDialog = new WorkflowImportDialog();
+            }
+            importDialog.toggle();
+        };
 
         // Wait for menu to be ready and add button
-        await this.addMenuButton(importDialog);
+        await this.addMenuButton(toggleDialog);
         
         // Also add keyboard shortcut (Ctrl/Cmd + Shift + I)
         document.addEventListener("keydown", (e) => {
             if ((e.ctrlKey || e.metaKey) && e.shiftKey && e.key === "I") {
                 e.preventDefault();
-                importDialog.toggle();
+                toggleDialog();
             }
         });
 
         console.log("[Workflow Importer] Extension loaded");
     },
 
-    async addMenuButton(importDialog) {
+    async addMenuButton(toggleDialog) {
         // Try new-style menu first (ComfyUI 0.2.0+)
         try {
             const { ComfyButtonGroup } = await import("../../scripts/ui/components/buttonGroup.js");
@@ -584,7 +616,7 @@ app.registerExtension({
             // Create import button for new-style menu
             const importButton = new ComfyButton({
                 icon: "file-import",
-                action: () => importDialog.toggle(),
+                action: toggleDialog,
                 tooltip: "Import Workflow from Image (Ctrl+Shift+I)",
                 content: "Import"
             });
@@ -597,16 +629,16 @@ app.registerExtension({
             
         } catch (err) {
             console.log("[Workflow Importer] New-style menu not available, using legacy menu");
-            this.addLegacyMenuButton(importDialog);
+            this.addLegacyMenuButton(toggleDialog);
         }
     },
 
-    addLegacyMenuButton(importDialog) {
+    addLegacyMenuButton(toggleDialog) {
         // Find the legacy menu container
         const menuContainer = document.querySelector(".comfy-menu");
         if (!menuContainer) {
             // Try again after a short delay
-            setTimeout(() => this.addLegacyMenuButton(importDialog), 500);
+            setTimeout(() => this.addLegacyMenuButton(toggleDialog), 500);
             return;
         }
 
@@ -618,7 +650,7 @@ app.registerExtension({
         importButton.id = "workflow-import-button";
         importButton.textContent = "Import";
         importButton.title = "Import Workflow from Image (Ctrl+Shift+I)";
-        importButton.onclick = () => importDialog.toggle();
+        importButton.onclick = toggleDialog;
         
         // Style to match other buttons
         importButton.style.cssText = `